@@ -1,25 +1,105 @@
-import argparse, yaml
+import argparse, functools, yaml
+import numpy as np
+import pandas as pd
 from pathlib import Path
 from metrics_source import load_csv
 from detectors import rolling_zscore_anomalies, isolation_forest_anomalies
 from summarizer import templated_summary
 from notifiers import print_notify
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml; use the pure-Python loader
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow is optional; fall back to DataFrame.to_csv
+    pa = None
+
+# Columns carried from detector output into reports and last_anomalies.csv
+# ("zscore" only exists for the rolling z-score method)
+_REPORT_COLUMNS = ("timestamp", "node", "cpu", "memory", "latency_ms", "zscore")
+
+# Appended to suggestions for nodes with repeated anomalies
+_RECURRENCE_NOTE = "\nNote: Multiple anomalies detected on this node recently → consider cordoning or replacing node."
+
+# Remediation templates indexed by severity bucket (see _severity_conditions);
+# the last entry is the informational fallback when no rule matches
+_ACTION_TEMPLATES = (
+    "🚨 Critical: Node {node} shows CPU {cpu:.1f}% + Memory {mem:.1f}%.\n"
+    "Likely cause: memory leak or workload saturation.\n"
+    "Suggested Action: Restart affected pod and check garbage collection logs.",
+    "🚨 Critical: High CPU {cpu:.1f}% with Latency {lat:.0f}ms on {node}.\n"
+    "Possible DB or downstream service bottleneck.\n"
+    "Suggested Action: Profile DB queries and scale replicas if needed.",
+    "⚠️ Warning: Latency {lat:.0f}ms on {node} while CPU/Memory normal.\n"
+    "Likely cause: network congestion or downstream dependency issue.\n"
+    "Suggested Action: Check API gateway logs and network connectivity.",
+    "🚨 Critical: CPU spike {cpu:.1f}% on {node}.\n"
+    "Suggested Action: Kill runaway process or scale api-service replicas.",
+    "⚠️ Warning: Sustained CPU load {cpu:.1f}% on {node}.\n"
+    "Suggested Action: Inspect logs for infinite loops or long-running jobs.",
+    "🚨 Critical: Memory exhaustion {mem:.1f}% on {node}.\n"
+    "Suggested Action: Restart pod, check heap dump, and tune JVM/GC params.",
+    "⚠️ Warning: Elevated memory usage {mem:.1f}% on {node}.\n"
+    "Suggested Action: Monitor caches and investigate object retention.",
+    "⚠️ Warning: Latency above 150ms ({lat:.0f}ms) on {node}.\n"
+    "Suggested Action: Check DB indexes and downstream service health.",
+    "ℹ️ Informational: Mild anomaly on {node}.\n"
+    "Suggested Action: Monitor trends; no immediate remediation required.",
+)
+
+
+def _severity_conditions(cpu, mem, lat):
+    """
+    Severity rules in precedence order (first match wins).
 
+    Works element-wise on NumPy arrays as well as on plain floats, so the
+    per-row and vectorized suggestion paths share a single rule set.
+    """
+    return (
+        # Both CPU + Memory critical → strong sign of saturation or leak
+        (cpu >= 90) & (mem >= 85),
+        # High CPU combined with high latency → DB or downstream bottleneck
+        (cpu >= 85) & (lat >= 200),
+        # Latency issue while resource usage normal → network issue
+        (lat >= 250) & (cpu < 70) & (mem < 70),
+        # Extreme CPU spike
+        cpu >= 95,
+        # Sustained CPU load but not maxed out
+        cpu >= 80,
+        # Memory close to OOM
+        mem >= 90,
+        # Elevated memory usage
+        mem >= 75,
+        # Latency moderately high
+        lat >= 150,
+    )
+
+
+@functools.lru_cache(maxsize=8)
 def load_config(path: str) -> dict:
-    """Load YAML configuration file into a Python dictionary."""
-    with open(path, 'r') as f:
-        return yaml.safe_load(f)
+    """
+    Load YAML configuration file into a Python dictionary.
+
+    Parsed configs are cached per path, so the returned dict is shared
+    between callers and must be treated as read-only.
+    """
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
 
 
-def suggest_action(row, history=None):
+def suggest_action(row, node_counts=None):
     """
     Generate a context-aware remediation suggestion for anomalies.
 
     Logic considers:
       - Correlations between CPU, Memory, and Latency
       - Severity levels (critical, warning, informational)
-      - Duration / recurrence (if history of node anomalies is provided)
+      - Duration / recurrence (if per-node anomaly counts are provided,
+        e.g. `anomalies["node"].value_counts().to_dict()`)
 
     Returns a multi-line string resembling a DevOps runbook recommendation.
     """
@@ -30,78 +110,54 @@ def suggest_action(row, history=None):
     lat = float(row.get("latency_ms", 0))
     node = row.get("node", "unknown")
 
-    # Default fallback action
-    action = "⚠️ Anomaly detected. Investigate system health."
-
     # --- Correlation-based logic ---
-    if cpu >= 90 and mem >= 85:
-        # Both CPU + Memory critical → strong sign of saturation or leak
-        action = (
-            f"🚨 Critical: Node {node} shows CPU {cpu:.1f}% + Memory {mem:.1f}%.\n"
-            "Likely cause: memory leak or workload saturation.\n"
-            "Suggested Action: Restart affected pod and check garbage collection logs."
-        )
-    elif cpu >= 85 and lat >= 200:
-        # High CPU combined with high latency → DB or downstream bottleneck
-        action = (
-            f"🚨 Critical: High CPU {cpu:.1f}% with Latency {lat:.0f}ms on {node}.\n"
-            "Possible DB or downstream service bottleneck.\n"
-            "Suggested Action: Profile DB queries and scale replicas if needed."
-        )
-    elif lat >= 250 and cpu < 70 and mem < 70:
-        # Latency issue while resource usage normal → network issue
-        action = (
-            f"⚠️ Warning: Latency {lat:.0f}ms on {node} while CPU/Memory normal.\n"
-            "Likely cause: network congestion or downstream dependency issue.\n"
-            "Suggested Action: Check API gateway logs and network connectivity."
-        )
-    elif cpu >= 95:
-        # Extreme CPU spike
-        action = (
-            f"🚨 Critical: CPU spike {cpu:.1f}% on {node}.\n"
-            "Suggested Action: Kill runaway process or scale api-service replicas."
-        )
-    elif cpu >= 80:
-        # Sustained CPU load but not maxed out
-        action = (
-            f"⚠️ Warning: Sustained CPU load {cpu:.1f}% on {node}.\n"
-            "Suggested Action: Inspect logs for infinite loops or long-running jobs."
-        )
-    elif mem >= 90:
-        # Memory close to OOM
-        action = (
-            f"🚨 Critical: Memory exhaustion {mem:.1f}% on {node}.\n"
-            "Suggested Action: Restart pod, check heap dump, and tune JVM/GC params."
-        )
-    elif mem >= 75:
-        # Elevated memory usage
-        action = (
-            f"⚠️ Warning: Elevated memory usage {mem:.1f}% on {node}.\n"
-            "Suggested Action: Monitor caches and investigate object retention."
-        )
-    elif lat >= 150:
-        # Latency moderately high
-        action = (
-            f"⚠️ Warning: Latency above 150ms ({lat:.0f}ms) on {node}.\n"
-            "Suggested Action: Check DB indexes and downstream service health."
-        )
-    else:
-        # Mild anomaly → no urgent remediation
-        action = (
-            f"ℹ️ Informational: Mild anomaly on {node}.\n"
-            "Suggested Action: Monitor trends; no immediate remediation required."
-        )
+    # Pick the first matching severity rule (informational if none match)
+    conditions = _severity_conditions(cpu, mem, lat)
+    bucket = next((i for i, hit in enumerate(conditions) if hit), len(conditions))
+    action = _ACTION_TEMPLATES[bucket].format(node=node, cpu=cpu, mem=mem, lat=lat)
 
     # --- Historical duration check ---
-    if history is not None:
-        node_history = history[history["node"] == node]
-        # If the same node has frequent anomalies → mark for deeper review
-        if not node_history.empty and len(node_history) > 3:
-            action += "\nNote: Multiple anomalies detected on this node recently → consider cordoning or replacing node."
+    # If the same node has frequent anomalies → mark for deeper review
+    if node_counts and node_counts.get(node, 0) > 3:
+        action += _RECURRENCE_NOTE
 
     return action
 
 
+def suggest_actions_vec(df: pd.DataFrame, node_counts=None) -> pd.Series:
+    """
+    Vectorized counterpart of `suggest_action` for a whole anomalies DataFrame.
+
+    The severity rules are evaluated once per column with `np.select`, giving a
+    bucket id per row; only the chosen template is then formatted for each row.
+
+    `node_counts` maps node → number of recent anomalies, as in `suggest_action`.
+
+    Returns a Series of suggestion strings aligned with `df.index`.
+    """
+    n = len(df)
+    zeros = np.zeros(n)
+
+    # Extract metric columns (missing columns behave like 0, as in suggest_action)
+    cpu = df["cpu"].to_numpy(dtype=float) if "cpu" in df else zeros
+    mem = df["memory"].to_numpy(dtype=float) if "memory" in df else zeros
+    lat = df["latency_ms"].to_numpy(dtype=float) if "latency_ms" in df else zeros
+    nodes = df["node"].to_numpy() if "node" in df else np.full(n, "unknown", dtype=object)
+
+    # Same rules and precedence as suggest_action; first match wins
+    conditions = list(_severity_conditions(cpu, mem, lat))
+    bucket = np.select(conditions, range(len(conditions)), default=len(conditions))
+
+    actions = []
+    for b, nd, c, m, l in zip(bucket.tolist(), nodes, cpu.tolist(), mem.tolist(), lat.tolist()):
+        action = _ACTION_TEMPLATES[b].format(node=nd, cpu=c, mem=m, lat=l)
+        if node_counts and node_counts.get(nd, 0) > 3:
+            action += _RECURRENCE_NOTE
+        actions.append(action)
+
+    return pd.Series(actions, index=df.index, dtype=object)
+
+
 def main(config_path: str):
     """
     Main entrypoint for the anomaly detection agent.
@@ -135,26 +191,40 @@ def main(config_path: str):
             window=det.get("rolling_window", 20),
             zthr=det.get("zscore_threshold", 3.0)
         )
-        anomalies = out[out["is_anomaly"]].copy()
-        anomalies["metric"] = "cpu"
+        metric = "cpu"
     else:
         out = isolation_forest_anomalies(
             df, cols=["cpu", "memory", "latency_ms"], contamination=0.02
         )
-        anomalies = out[out["is_anomaly"]].copy()
-        anomalies["metric"] = "composite"
+        metric = "composite"
+
+    # Keep only flagged rows and the columns reports/dashboard actually use
+    keep = [c for c in _REPORT_COLUMNS if c in out.columns]
+    anomalies = out.loc[out["is_anomaly"], keep].copy()
+    anomalies["metric"] = metric
 
     # --- Summarize and notify ---
     limit = runtime.get("limit_alerts", 10)
+    tail = anomalies.tail(limit)
+    suggestions = suggest_actions_vec(tail).tolist()
+
+    # Pull report columns out once instead of materializing a Series per row
+    n = len(tail)
+    timestamps = tail["timestamp"].tolist()
+    nodes = tail["node"].tolist() if "node" in tail else ["unknown"] * n
+    metrics = tail["metric"].tolist()
+    cpus = tail["cpu"].tolist() if "cpu" in tail else [0.0] * n
+    threshold = det.get("zscore_threshold", "N/A")
+
     reports = []
-    for _, row in anomalies.tail(limit).iterrows():
+    for i in range(n):
         event = {
-            "timestamp": row["timestamp"],
-            "node": row.get("node", "unknown"),
-            "metric": row.get("metric", "cpu"),
-            "value": round(float(row.get("cpu", 0.0)), 2),
-            "threshold": det.get("zscore_threshold", "N/A"),
-            "suggestion": suggest_action(row),
+            "timestamp": timestamps[i],
+            "node": nodes[i],
+            "metric": metrics[i],
+            "value": round(float(cpus[i]), 2),
+            "threshold": threshold,
+            "suggestion": suggestions[i],
         }
         msg = templated_summary(event)
         reports.append(msg)
@@ -165,8 +235,15 @@ def main(config_path: str):
 
     # --- Save artifacts for dashboard ---
     out_dir = Path(__file__).resolve().parents[1] / "data"
-    anomalies.tail(limit).to_csv(out_dir / "last_anomalies.csv", index=False)
-    (out_dir / "last_reports.txt").write_text("\n\n".join(reports))
+    if pa is not None:
+        # Arrow's C++ writer avoids per-row Python string formatting
+        pacsv.write_csv(pa.Table.from_pandas(tail, preserve_index=False), out_dir / "last_anomalies.csv")
+    else:
+        tail.to_csv(out_dir / "last_anomalies.csv", index=False)
+
+    # Stream reports (blank-line separated) instead of joining them first
+    with open(out_dir / "last_reports.txt", "w", buffering=1 << 20) as f:
+        f.writelines(("\n\n" + r) if i else r for i, r in enumerate(reports))
 
 
 if __name__ == "__main__":
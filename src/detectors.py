@@ -1,7 +1,117 @@
+import functools
 import pandas as pd
 import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
 from sklearn.ensemble import IsolationForest
 
+try:
+    import bottleneck as bn
+except ImportError:  # bottleneck is optional; fall back to pandas rolling windows
+    bn = None
+
+# Below this many samples, importing numba and loading the compiled kernel
+# costs more than it saves over Bottleneck/pandas rolling windows
+_NUMBA_MIN_ROWS = 20_000_000
+
+
+def _rolling_zscore_kernel(arr, window):
+    """
+    Single-pass rolling z-score using Welford's online mean/variance update.
+
+    A ring buffer holds the last `window` values so the sample leaving the
+    window can be removed with the reverse Welford update, giving O(1) work
+    per sample. Windows containing NaN (or with zero variance) yield NaN,
+    matching pandas' `rolling(window, min_periods=window)` semantics.
+    Like pandas, a run of identical values is treated as exactly zero
+    variance so that round-off left over in M2 does not produce huge scores.
+    """
+    n = arr.shape[0]
+    z = np.empty(n)
+    buf = np.empty(window)
+    count = 0      # number of non-NaN values currently in the window
+    nans = 0       # number of NaN values currently in the window
+    mean = 0.0
+    m2 = 0.0
+    same = 0       # length of the current run of identical values
+
+    for i in range(n):
+        x = arr[i]
+        if i > 0 and x == arr[i - 1]:
+            same += 1
+        else:
+            same = 1
+
+        # Add the incoming sample
+        if np.isnan(x):
+            nans += 1
+        else:
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+
+        # Remove the sample leaving the window
+        if i >= window:
+            old = buf[i % window]
+            if np.isnan(old):
+                nans -= 1
+            elif count == 1:
+                count = 0
+                mean = 0.0
+                m2 = 0.0
+            else:
+                count -= 1
+                delta = old - mean
+                mean -= delta / count
+                m2 -= delta * (old - mean)
+        buf[i % window] = x
+
+        if i < window - 1 or nans > 0:
+            z[i] = np.nan
+            continue
+
+        var = m2 / window
+        if same < window and var > 0.0:
+            z[i] = (x - mean) / np.sqrt(var)
+        else:
+            z[i] = np.nan
+
+    return z
+
+
+def _flat_windows(arr, window):
+    """
+    Boolean mask of positions whose trailing `window` values are all identical.
+
+    Computed from the length of the run of equal values ending at each
+    position (NaN never compares equal, so it always starts a new run).
+    """
+    n = arr.shape[0]
+    pos = np.arange(n)
+    run_start = np.zeros(n, dtype=np.int64)
+    if n > 1:
+        run_start[1:] = np.where(arr[1:] == arr[:-1], 0, pos[1:])
+    np.maximum.accumulate(run_start, out=run_start)
+    return pos - run_start + 1 >= window
+
+
+@functools.lru_cache(maxsize=None)
+def _rolling_zscore_numba():
+    """
+    Return the numba-compiled `_rolling_zscore_kernel`, or None without numba.
+
+    numba is imported lazily, on first use, so that small inputs never pay
+    its import and JIT-cache loading time.
+    """
+    try:
+        import numba
+    except ImportError:  # numba is optional; fall back to Bottleneck/pandas
+        return None
+
+    # fastmath is left off: it would let LLVM drop the NaN checks above, and the
+    # loop-carried Welford recurrence cannot be vectorised anyway.
+    return numba.njit(cache=True)(_rolling_zscore_kernel)
+
 
 def rolling_zscore_anomalies(df: pd.DataFrame, col: str, window: int = 20, zthr: float = 3.0):
     """
@@ -24,25 +134,89 @@ def rolling_zscore_anomalies(df: pd.DataFrame, col: str, window: int = 20, zthr:
         Copy of input DataFrame with two additional columns:
           - "zscore": computed rolling z-score
           - "is_anomaly": True if absolute z-score >= threshold
+
+    Raises
+    ------
+    ValueError
+        If `window` is smaller than 1.
     """
-    # Extract column values as floats
-    s = df[col].astype(float)
+    if window < 1:
+        raise ValueError(f"window must be a positive integer, got {window!r}")
 
-    # Compute rolling mean and std dev
-    mu = s.rolling(window, min_periods=window).mean()
-    sd = s.rolling(window, min_periods=window).std(ddof=0)
+    # Extract column values as a float32 ndarray (no copy if already float32);
+    # mean/variance are still accumulated in float64
+    values = df[col].to_numpy(dtype=np.float32)
 
-    # Z-score = (value - mean) / std
-    z = (s - mu) / (sd.replace(0, np.nan))
+    # Very long series: single pass over the data computing rolling mean,
+    # std and z-score in one compiled kernel
+    kernel = _rolling_zscore_numba() if len(values) >= _NUMBA_MIN_ROWS else None
+    if kernel is not None:
+        z = kernel(values, int(window))
+    elif len(values) < window:
+        # Not enough samples for a single full window
+        z = np.full(len(values), np.nan)
+    else:
+        # Compute moving mean and std dev in float64
+        # (Bottleneck accumulates float32 input in float32)
+        values = values.astype(np.float64)
+        if bn is not None:
+            mu = bn.move_mean(values, window=int(window), min_count=int(window))
+            sd = bn.move_std(values, window=int(window), min_count=int(window), ddof=0)
+        else:
+            s = pd.Series(values)
+            mu = s.rolling(window, min_periods=window).mean().to_numpy()
+            sd = s.rolling(window, min_periods=window).std(ddof=0).to_numpy()
 
-    # Copy DataFrame to avoid side effects
-    df = df.copy()
-    df["zscore"] = z
-    df["is_anomaly"] = (df["zscore"].abs() >= zthr)
+        # Z-score = (value - mean) / std, undefined where the window is flat.
+        # Round-off can leave a tiny non-zero std over a run of identical
+        # values, so such windows are masked explicitly, as in the kernel.
+        sd[(sd == 0) | _flat_windows(values, window)] = np.nan
+        z = (values - mu) / sd
+
+    # Flag values whose absolute z-score reaches the threshold
+    mask = np.abs(z) >= zthr
+
+    # assign() returns a new DataFrame, so the caller's frame is left untouched
+    df = df.assign(zscore=z, is_anomaly=mask)
 
     return df
 
 
+def _feature_matrix(df: pd.DataFrame, cols) -> np.ndarray:
+    """
+    Build the Isolation Forest feature matrix from `cols` of `df`.
+
+    Returns a C-contiguous float32 array with gaps forward-filled (then
+    back-filled) along the time axis. float32 C-order is the layout sklearn's
+    tree code works on, so fit/predict use it as-is instead of making their
+    own converted copy.
+    """
+    return np.ascontiguousarray(df[cols].ffill().bfill().to_numpy(dtype=np.float32))
+
+
+# Below this many rows, thread start-up outweighs parallel tree scoring
+_PARALLEL_PREDICT_MIN_ROWS = 50_000
+
+
+def _predict_chunked(model: IsolationForest, X: np.ndarray) -> np.ndarray:
+    """
+    Predict with `model` over row chunks of `X` on a thread pool.
+
+    Tree traversal in sklearn's Cython code releases the GIL, so threads
+    scale with cores; predictions are per-row, so chunking does not change
+    them. Small inputs are predicted in a single call.
+    """
+    n_jobs = effective_n_jobs(-1)
+    if n_jobs == 1 or len(X) < _PARALLEL_PREDICT_MIN_ROWS:
+        return model.predict(X)
+
+    chunks = np.array_split(X, n_jobs)
+    preds = Parallel(n_jobs=n_jobs, backend="threading")(
+        delayed(model.predict)(chunk) for chunk in chunks
+    )
+    return np.concatenate(preds)
+
+
 def isolation_forest_anomalies(df: pd.DataFrame, cols, contamination=0.02, random_state=42):
     """
     Detect anomalies in multiple metrics using Isolation Forest.
@@ -65,18 +239,22 @@ def isolation_forest_anomalies(df: pd.DataFrame, cols, contamination=0.02, rando
           - "is_anomaly": True if flagged as anomaly by Isolation Forest
     """
     # Extract feature matrix with NaN handling
-    X = df[cols].astype(float).fillna(method="ffill").fillna(method="bfill")
+    X = _feature_matrix(df, cols)
 
-    # Train Isolation Forest
+    # Train Isolation Forest: 256-sample subsampling per tree and
+    # parallel tree construction
     model = IsolationForest(
-        n_estimators=200,
+        n_estimators=100,
+        max_samples=min(256, len(X)),
         contamination=contamination,
-        random_state=random_state
+        random_state=random_state,
+        n_jobs=-1,
+        bootstrap=False,
     )
     model.fit(X)
 
     # Predictions: -1 = anomaly, 1 = normal
-    pred = model.predict(X)
+    pred = _predict_chunked(model, X)
 
     df = df.copy()
     df["is_anomaly"] = (pred == -1)
@@ -9,7 +9,7 @@ OUT = os.path.join(os.path.dirname(__file__), "..", "data", "sample_metrics.csv"
 os.makedirs(os.path.dirname(OUT), exist_ok=True)
 
 
-def simulate_series(start, periods=600, freq_s=30, base=35, noise=5, spikes=5):
+def simulate_series(start, periods=600, freq_s=30, base=35, noise=5, spikes=5, seed=None):
     """
     Generate a synthetic time series dataset for system metrics (CPU, memory, latency).
 
@@ -27,6 +27,8 @@ def simulate_series(start, periods=600, freq_s=30, base=35, noise=5, spikes=5):
         Standard deviation of random noise applied to CPU values.
     spikes : int, optional (default=5)
         Number of random anomaly spikes to inject into CPU values.
+    seed : int or None, optional (default=None)
+        Seed for the random generator; None draws fresh OS entropy.
 
     Returns
     -------
@@ -39,33 +41,66 @@ def simulate_series(start, periods=600, freq_s=30, base=35, noise=5, spikes=5):
           - latency_ms: Request latency in milliseconds
     """
     # Create time axis (regular intervals from start time)
-    times = [start + i * pd.Timedelta(seconds=freq_s) for i in range(periods)]
+    times = pd.date_range(start=start, periods=periods, freq=pd.Timedelta(seconds=freq_s))
+
+    # One generator for every draw (PCG64 is faster than the legacy global RandomState)
+    rng = np.random.default_rng(seed)
+
+    # Phase axis and a scratch buffer reused for the sinusoidal/noise terms
+    x = np.linspace(0, 4 * np.pi, periods)
+    scratch = np.empty(periods)
 
     # Base CPU load with random noise
-    values = base + np.random.normal(0, noise, size=periods)
+    values = np.empty(periods)
+    rng.standard_normal(out=values)
+    values *= noise
+    values += base
 
     # Add sinusoidal variation to simulate periodic load patterns
-    x = np.linspace(0, 4 * np.pi, periods)
-    values += 8 * np.sin(x)
+    np.sin(x, out=scratch)
+    scratch *= 8
+    values += scratch
 
     # Inject random anomaly spikes into CPU usage
-    spike_idx = np.random.choice(periods, size=spikes, replace=False)
-    for idx in spike_idx:
-        values[idx] += np.random.uniform(35, 60)
+    # (indices are unique, so a single fancy-indexed add is safe)
+    spike_idx = rng.choice(periods, size=spikes, replace=False)
+    values[spike_idx] += rng.uniform(35, 60, size=spikes)
 
     # Keep CPU values within [0, 100]
-    values = np.clip(values, 0, 100)
+    np.clip(values, 0, 100, out=values)
+
+    nodes = rng.choice(["node-a", "node-b", "node-c"], size=periods)
+
+    # Memory: base ~40%, add sinusoidal + Gaussian noise
+    memory = np.empty(periods)
+    rng.standard_normal(out=memory)
+    memory *= 6
+    memory += 40
+    np.cos(x, out=scratch)
+    scratch *= 6
+    memory += scratch
+    np.clip(memory, 0, 100, out=memory)
+
+    # Latency: base ~80ms, add sinusoidal + Gaussian noise
+    latency = np.empty(periods)
+    np.multiply(x, 2, out=latency)
+    np.sin(latency, out=latency)
+    latency *= 15
+    latency += 80
+    rng.standard_normal(out=scratch)
+    scratch *= 10
+    latency += scratch
+    np.clip(latency, 10, 400, out=latency)
 
     # Assemble DataFrame with CPU, memory, and latency metrics
+    # (columns are already final arrays, so skip pandas' defensive copy)
     return pd.DataFrame({
         "timestamp": times,
-        "node": np.random.choice(["node-a", "node-b", "node-c"], size=periods),
+        "node": nodes,
         "cpu": values,
-        # Memory: base ~40%, add sinusoidal + Gaussian noise
-        "memory": np.clip(40 + np.random.normal(0, 6, size=periods) + 6 * np.cos(x), 0, 100),
-        # Latency: base ~80ms, add sinusoidal + Gaussian noise
-        "latency_ms": np.clip(80 + 15 * np.sin(2 * x) + np.random.normal(0, 10, periods), 10, 400)
-    })
+        "memory": memory,
+        "latency_ms": latency,
+    }, copy=False)
 
 
 if __name__ == "__main__":
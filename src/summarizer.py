@@ -1,4 +1,3 @@
-import textwrap
 from typing import Dict
 
 def templated_summary(event: Dict) -> str:
@@ -36,10 +35,4 @@ def templated_summary(event: Dict) -> str:
     suggestion = event.get("suggestion", "Investigate logs or scale pods.")
 
     # Build a structured, user-friendly incident report
-    return textwrap.dedent(f"""
-    {suggestion}
-    • Time: {when}
-    • Node: {node}
-    • Metric: {metric}
-    • Value: {value}
-    """).strip()
+    return f"{suggestion}\n• Time: {when}\n• Node: {node}\n• Metric: {metric}\n• Value: {value}"